@@ -3,18 +3,43 @@
 Interactive annotation tool for creating gold standard NER labels.
 
 Usage:
-    python create_gold_standard.py [document_id]
+    python create_gold_standard.py [document_id] [--entities FILE]
 
 If no document_id provided, shows list of available documents.
+
+With --entities, snippets are annotated from a tab-separated file of known
+entities, one per line: snippet_id, entity text, type. Snippets with no lines
+in the file, or with entities that cannot be found, are annotated
+interactively.
 """
 
+import argparse
+import io
 import json
 import sys
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Tuple
 from datetime import datetime
 
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # Resolve paths relative to this script directory so it works regardless of CWD
 SCRIPT_DIR = Path(__file__).parent
 
@@ -34,8 +59,7 @@ def load_snippets(doc_id: str) -> Dict:
         print(f"ERROR: Snippets file not found: {snippets_file}")
         sys.exit(1)
 
-    with open(snippets_file, 'r') as f:
-        return json.load(f)
+    return _loads(snippets_file.read_bytes())
 
 
 def display_snippet(snippet: Dict, snippet_num: int, total: int):
@@ -57,20 +81,34 @@ def highlight_entity(text: str, start: int, end: int) -> str:
             text[end:])
 
 
+@lru_cache(maxsize=4096)
+def _compiled(entity_text: str):
+    """Compile (once) a case-insensitive literal pattern for entity text."""
+    return re.compile(re.escape(entity_text), re.IGNORECASE)
+
+
 def find_entity_in_text(text: str, entity_text: str, start_hint: int = 0) -> List[Tuple[int, int]]:
-    """Find all occurrences of entity text in snippet."""
-    matches = []
-    pattern = re.escape(entity_text)
-    for match in re.finditer(pattern, text, re.IGNORECASE):
-        matches.append((match.start(), match.end()))
-    return matches
+    """Find all occurrences of entity text in snippet, searching from start_hint."""
+    return [(m.start(), m.end()) for m in _compiled(entity_text).finditer(text, start_hint)]
 
 
-def annotate_snippet_interactive(snippet: Dict, snippet_num: int, total: int) -> Dict:
-    """Interactively annotate a single snippet."""
+def annotate_snippet_interactive(snippet: Dict, snippet_num: int, total: int,
+                                 entities: List[Tuple] = None) -> Dict:
+    """
+    Interactively annotate a single snippet.
+
+    entities optionally holds (start, end, type, text, notes) tuples already
+    found (e.g. by annotate_snippet_batch) to be completed by hand.
+    """
     display_snippet(snippet, snippet_num, total)
 
-    entities = []
+    # (start, end, type, text, notes) tuples sort natively by start
+    entities = list(entities or [])
+    if entities:
+        print("Already annotated:")
+        for start, end, etype, text, _ in sorted(entities):
+            print(f"  {text} ({etype}) [{start}:{end}]")
+        print()
 
     print("Enter entities one at a time. Type 'done' when finished.\n")
     print("For each entity, you'll provide:")
@@ -149,25 +187,100 @@ def annotate_snippet_interactive(snippet: Dict, snippet_num: int, total: int) ->
 
         # Add entity (or entities if multiple matches)
         for start, end in selected_matches:
-            entity = {
-                'text': snippet['text'][start:end],
-                'start': start,
-                'end': end,
-                'type': entity_type,
-                'confidence': 1.0,
-                'notes': notes if notes else ''
-            }
-            entities.append(entity)
-            print(f"  ✓ Added: {entity['text']} ({entity_type})")
+            entity_text = snippet['text'][start:end]
+            entities.append((start, end, entity_type, entity_text, notes))
+            print(f"  ✓ Added: {entity_text} ({entity_type})")
 
         entity_num += 1
 
+    return _annotated_snippet(snippet, _entity_dicts(entities))
+
+
+def annotate_snippet_batch(snippet: Dict, entity_specs: List[Tuple[str, str]]):
+    """
+    Annotate a snippet non-interactively from known (entity text, type) pairs.
+
+    All entity texts are matched case-insensitively in a single pass over the
+    snippet. Matching is leftmost-first; among texts starting at the same
+    position the longest wins, so a nested mention (e.g. "Hudson Bay" inside
+    "Hudson Bay Company") is not annotated twice.
+
+    Returns ((start, end, type, text, notes) tuples, specs that do not occur in
+    the snippet, specs that occur only inside another spec's matches).
+    """
+    text = snippet['text']
+    specs = sorted((spec for spec in entity_specs if spec[0]),
+                   key=lambda spec: len(spec[0]), reverse=True)
+
+    entities = []
+    matched = set()
+    if specs:
+        pattern = re.compile(
+            '|'.join(f'(?P<e{i}>{re.escape(entity_text)})'
+                     for i, (entity_text, _) in enumerate(specs)),
+            re.IGNORECASE)
+        for match in pattern.finditer(text):
+            spec_index = int(match.lastgroup[1:])
+            matched.add(spec_index)
+            entity_type = specs[spec_index][1]
+            entities.append((match.start(), match.end(), entity_type.upper(), match.group(), ''))
+
+    unmatched = []
+    covered = []
+    for i, spec in enumerate(specs):
+        if i in matched:
+            continue
+        if re.search(re.escape(spec[0]), text, re.IGNORECASE):
+            covered.append(spec)
+        else:
+            unmatched.append(spec)
+    return entities, unmatched, covered
+
+
+def load_entity_specs(entities_file: Path) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Read known entities: tab-separated snippet_id, entity text, type lines.
+
+    Blank lines and lines starting with '#' are ignored, as are lines whose
+    type is not one of ENTITY_TYPES. Returns {snippet_id: [(entity text,
+    type), ...]}; snippet IDs match either form ("3" or "003").
+    """
+    specs = {}
+    with open(entities_file, encoding='utf-8') as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#'):
+                continue
+            fields = line.split('\t')
+            if len(fields) != 3:
+                print(f"  WARNING: {entities_file}:{line_num}: expected 3 tab-separated fields, skipping")
+                continue
+            snippet_id, entity_text, entity_type = (field.strip() for field in fields)
+            entity_type = entity_type.upper()
+            if entity_type not in ENTITY_TYPES:
+                print(f"  WARNING: {entities_file}:{line_num}: '{entity_type}' is not a standard type, skipping")
+                continue
+            key = snippet_id.lstrip('0') or '0'
+            specs.setdefault(key, []).append((entity_text, entity_type))
+    return specs
+
+
+def _entity_dicts(entities: List[Tuple]) -> List[Dict]:
+    """Gold-file entity dicts from (start, end, type, text, notes) tuples, by position."""
+    return [
+        {'text': text, 'start': start, 'end': end, 'type': etype, 'confidence': 1.0, 'notes': notes}
+        for start, end, etype, text, notes in sorted(entities)
+    ]
+
+
+def _annotated_snippet(snippet: Dict, entities: List[Dict]) -> Dict:
+    """Package annotated entities with their snippet for the gold file."""
     return {
         'snippet_id': f"{snippet['snippet_id']:03d}",
         'text': snippet['text'],
         'char_start': snippet['char_start'],
         'char_end': snippet['char_end'],
-        'entities': sorted(entities, key=lambda e: e['start'])
+        'entities': entities
     }
 
 
@@ -185,12 +298,12 @@ def save_gold_standard(doc_id: str, doc_metadata: Dict, annotated_snippets: List
 
     output_file = SCRIPT_DIR / 'gold_standard' / f'{doc_id}_gold.json'
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    output_file.write_bytes(_dumps(output))
 
-    print(f"\n✓ Gold standard saved to: {output_file}")
-    print(f"  Total snippets: {len(annotated_snippets)}")
-    print(f"  Total entities: {output['total_entities']}")
+    out = io.StringIO()
+    print(f"\n✓ Gold standard saved to: {output_file}", file=out)
+    print(f"  Total snippets: {len(annotated_snippets)}", file=out)
+    print(f"  Total entities: {output['total_entities']}", file=out)
 
     # Print entity type breakdown
     entity_counts = {}
@@ -199,40 +312,75 @@ def save_gold_standard(doc_id: str, doc_metadata: Dict, annotated_snippets: List
             entity_type = entity['type']
             entity_counts[entity_type] = entity_counts.get(entity_type, 0) + 1
 
-    print(f"\n  Entity breakdown:")
+    print(f"\n  Entity breakdown:", file=out)
     for etype, count in sorted(entity_counts.items()):
-        print(f"    {etype}: {count}")
+        print(f"    {etype}: {count}", file=out)
+
+    sys.stdout.write(out.getvalue())
+
+
+def read_snippets_summary(snippets_file: Path) -> Tuple[str, int, Dict]:
+    """
+    Return (document_id, number of snippets, metadata) for a snippets file.
+
+    With ijson installed the file is streamed and the full document is never
+    built; only metadata.doc_type and metadata.language are kept.
+    """
+    if ijson is None:
+        data = _loads(snippets_file.read_bytes())
+        return data['document_id'], len(data['snippets']), data['metadata']
+
+    doc_id = None
+    num_snippets = 0
+    metadata = {}
+    with open(snippets_file, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == 'document_id':
+                doc_id = value
+            elif prefix == 'snippets.item' and event == 'start_map':
+                num_snippets += 1
+            elif prefix in ('metadata.doc_type', 'metadata.language'):
+                metadata[prefix.split('.', 1)[1]] = value
+    return doc_id, num_snippets, metadata
 
 
 def list_available_documents():
     """List all documents with snippets available."""
+    out = io.StringIO()  # Emitted with a single write at the end
+
     snippets_dir = SCRIPT_DIR / 'snippets'
     snippet_files = list(snippets_dir.glob('*_snippets.json'))
 
-    print("Available documents for annotation:\n")
-    print(f"{'Document ID':<35} {'Snippets':<10} {'Type':<12} {'Language':<10}")
-    print("-" * 75)
+    print("Available documents for annotation:\n", file=out)
+    print(f"{'Document ID':<35} {'Snippets':<10} {'Type':<12} {'Language':<10}", file=out)
+    print("-" * 75, file=out)
 
     for snippet_file in sorted(snippet_files):
-        with open(snippet_file, 'r') as f:
-            data = json.load(f)
-            doc_id = data['document_id']
-            num_snippets = len(data['snippets'])
-            doc_type = data['metadata'].get('doc_type', 'unknown')
-            language = data['metadata'].get('language', 'unknown')
-            print(f"{doc_id:<35} {num_snippets:<10} {doc_type:<12} {language:<10}")
+        doc_id, num_snippets, metadata = read_snippets_summary(snippet_file)
+        doc_type = metadata.get('doc_type', 'unknown')
+        language = metadata.get('language', 'unknown')
+        print(f"{doc_id:<35} {num_snippets:<10} {doc_type:<12} {language:<10}", file=out)
 
-    print(f"\nTotal: {len(snippet_files)} documents")
+    print(f"\nTotal: {len(snippet_files)} documents", file=out)
+
+    sys.stdout.write(out.getvalue())
 
 
 def main():
     """Main annotation workflow."""
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description='Create gold standard NER annotations')
+    parser.add_argument('document_id', nargs='?', help='Document to annotate (omit to list documents)')
+    parser.add_argument('--entities', default=None,
+                        help='Tab-separated file of known entities (snippet_id, text, type) to annotate from')
+    args = parser.parse_args()
+
+    if args.document_id is None:
         list_available_documents()
-        print("\nUsage: python create_gold_standard.py [document_id]")
+        print("\nUsage: python create_gold_standard.py [document_id] [--entities FILE]")
         return 0
 
-    doc_id = sys.argv[1]
+    doc_id = args.document_id
+    known_entities = load_entity_specs(Path(args.entities)) if args.entities else {}
 
     print(f"\n{'='*80}")
     print(f"GOLD STANDARD ANNOTATION")
@@ -248,12 +396,29 @@ def main():
     print(f"Language: {data['metadata'].get('language', 'Unknown')}")
     print(f"Total snippets: {len(snippets)}")
 
-    input("\nPress Enter to begin annotation...")
+    if not known_entities:
+        input("\nPress Enter to begin annotation...")
 
-    # Annotate each snippet
+    # Annotate each snippet: from the known entities where they cover it,
+    # interactively otherwise
     annotated = []
     for i, snippet in enumerate(snippets, 1):
-        result = annotate_snippet_interactive(snippet, i, len(snippets))
+        specs = known_entities.get(str(snippet['snippet_id']).lstrip('0') or '0')
+        if not specs:
+            result = annotate_snippet_interactive(snippet, i, len(snippets))
+        else:
+            entities, unmatched, covered = annotate_snippet_batch(snippet, specs)
+            for entity_text, entity_type in covered:
+                print(f"Snippet {snippet['snippet_id']}: '{entity_text}' ({entity_type}) not added: "
+                      f"every occurrence overlaps another entry.")
+            if unmatched:
+                print(f"\nSnippet {snippet['snippet_id']}: {len(unmatched)} known entities not found:")
+                for entity_text, entity_type in unmatched:
+                    print(f"  '{entity_text}' ({entity_type})")
+                result = annotate_snippet_interactive(snippet, i, len(snippets), entities)
+            else:
+                print(f"Snippet {snippet['snippet_id']}: annotated {len(entities)} entities from file")
+                result = _annotated_snippet(snippet, _entity_dicts(entities))
         if result is not None:
             annotated.append(result)
 
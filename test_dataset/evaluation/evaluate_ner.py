@@ -12,34 +12,62 @@ Usage:
     python evaluate_ner.py [gold_standard_dir] [predictions_dir] [model_name]
 """
 
+import io
 import json
 import sys
+from datetime import datetime
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict, Tuple, Set
-from collections import defaultdict
+from collections import Counter, defaultdict
 import argparse
 
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+# Gold and prediction files are only read, so prefer the SIMD parser for them.
+# Documents are materialized (not lazy proxies) because a gold/pred pair must
+# stay alive together, and a reused simdjson.Parser invalidates older results.
+try:
+    import simdjson
+    _loads_input = simdjson.loads
+except ImportError:
+    _loads_input = _loads
+
 
 class Entity:
     """Represents a single entity annotation."""
+    __slots__ = ('text', 'start', 'end', 'type', 'source', '_key')
+
     def __init__(self, text: str, start: int, end: int, etype: str, source: str = ""):
         self.text = text
         self.start = start
         self.end = end
         self.type = etype
         self.source = source  # For tracking which system predicted it
+        # Identity for exact matching; text and source are deliberately excluded
+        self._key = (start, end, etype)
 
     def __repr__(self):
         return f"Entity('{self.text}', {self.start}:{self.end}, {self.type})"
 
     def __eq__(self, other):
         """Exact match: same boundaries and type."""
-        return (self.start == other.start and
-                self.end == other.end and
-                self.type == other.type)
+        return self._key == other._key
 
     def __hash__(self):
-        return hash((self.start, self.end, self.type))
+        return hash(self._key)
 
     def overlaps(self, other) -> bool:
         """Check if two entities overlap."""
@@ -52,14 +80,18 @@ class Entity:
 
 def load_gold_standard(gold_file: Path) -> Dict:
     """Load gold standard annotations."""
-    with open(gold_file, 'r') as f:
-        return json.load(f)
+    return _loads_input(Path(gold_file).read_bytes())
 
 
 def load_predictions(pred_file: Path) -> Dict:
     """Load model predictions."""
-    with open(pred_file, 'r') as f:
-        return json.load(f)
+    return _loads_input(Path(pred_file).read_bytes())
+
+
+def load_document_pair(paths: Tuple[Path, Path]) -> Tuple[Dict, Dict]:
+    """Load a (gold file, prediction file) pair."""
+    gold_file, pred_file = paths
+    return load_gold_standard(gold_file), load_predictions(pred_file)
 
 
 def extract_entities(snippet_data: Dict, source: str = "") -> List[Entity]:
@@ -76,9 +108,78 @@ def extract_entities(snippet_data: Dict, source: str = "") -> List[Entity]:
     return entities
 
 
+def _build_span_index(entities: List[Entity]) -> Dict[str, Tuple[List[int], List[int], List[int], int]]:
+    """
+    Index entities by type for overlap queries.
+
+    Returns {type: (starts, ends, positions, max_len)} as parallel lists sorted
+    by start offset: positions are indices into `entities`, and max_len bounds
+    how far left of a query an overlapping span can begin.
+    """
+    by_type = defaultdict(list)
+    for i, ent in enumerate(entities):
+        by_type[ent.type].append((ent.start, ent.end, i))
+
+    index = {}
+    for etype, spans in by_type.items():
+        spans.sort(key=itemgetter(0))
+        starts = [start for start, _, _ in spans]
+        ends = [end for _, end, _ in spans]
+        positions = [i for _, _, i in spans]
+        max_len = max(end - start for start, end, _ in spans)
+        index[etype] = (starts, ends, positions, max_len)
+    return index
+
+
+def _overlapping(index: Dict, query: Entity) -> List[int]:
+    """Return indices of indexed entities of the query's type that overlap it."""
+    entry = index.get(query.type)
+    if entry is None:
+        return []
+    starts, ends, positions, max_len = entry
+
+    hits = []
+    query_start = query.start
+    lower = query_start - max_len
+    i = bisect_left(starts, query.end) - 1
+    while i >= 0 and starts[i] > lower:
+        if ends[i] > query_start:
+            hits.append(positions[i])
+        i -= 1
+    return hits
+
+
+def _prf(true_positives: int, total_pred: int, total_gold: int) -> Tuple[float, float, float]:
+    """Precision, recall and F1 from match counts (0 where undefined)."""
+    precision = true_positives / total_pred if total_pred > 0 else 0
+    recall = true_positives / total_gold if total_gold > 0 else 0
+    f1 = (2 * precision * recall / (precision + recall)
+          if (precision + recall) > 0 else 0)
+    return precision, recall, f1
+
+
+def _metrics_from_counts(true_positives: int, total_gold: int, total_pred: int) -> Dict:
+    """Build the metrics dict from raw match counts."""
+    precision, recall, f1 = _prf(true_positives, total_pred, total_gold)
+
+    return {
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'true_positives': true_positives,
+        'false_positives': total_pred - true_positives,
+        'false_negatives': total_gold - true_positives,
+        'total_gold': total_gold,
+        'total_pred': total_pred
+    }
+
+
 def compute_metrics(gold_entities: List[Entity],
                    pred_entities: List[Entity],
-                   match_type: str = 'exact') -> Dict:
+                   match_type: str = 'exact',
+                   *,
+                   tp_set: Set[Entity] = None,
+                   gold_index: Dict = None) -> Dict:
     """
     Compute precision, recall, F1.
 
@@ -86,69 +187,60 @@ def compute_metrics(gold_entities: List[Entity],
         gold_entities: Ground truth entities
         pred_entities: Predicted entities
         match_type: 'exact' or 'partial'
+        tp_set: Precomputed set(gold_entities) & set(pred_entities), if available
+        gold_index: Precomputed _build_span_index(gold_entities), if available
     """
     if match_type == 'exact':
-        true_positives = len(set(gold_entities) & set(pred_entities))
+        if tp_set is None:
+            tp_set = set(gold_entities) & set(pred_entities)
+        true_positives = len(tp_set)
     else:  # partial
+        # Each prediction claims the first (in list order) unmatched gold
+        # entity of the same type that overlaps it.
         true_positives = 0
-        matched_gold = set()
+        if gold_index is None:
+            gold_index = _build_span_index(gold_entities)
+        matched = bytearray(len(gold_entities))
         for pred in pred_entities:
-            for gold in gold_entities:
-                if gold not in matched_gold and pred.partial_match(gold):
-                    true_positives += 1
-                    matched_gold.add(gold)
-                    break
+            hits = [j for j in _overlapping(gold_index, pred) if not matched[j]]
+            if hits:
+                matched[min(hits)] = 1
+                true_positives += 1
 
-    false_positives = len(pred_entities) - true_positives
-    false_negatives = len(gold_entities) - true_positives
-
-    precision = true_positives / len(pred_entities) if pred_entities else 0
-    recall = true_positives / len(gold_entities) if gold_entities else 0
-    f1 = (2 * precision * recall / (precision + recall)
-          if (precision + recall) > 0 else 0)
-
-    return {
-        'precision': precision,
-        'recall': recall,
-        'f1': f1,
-        'true_positives': true_positives,
-        'false_positives': false_positives,
-        'false_negatives': false_negatives,
-        'total_gold': len(gold_entities),
-        'total_pred': len(pred_entities)
-    }
+    return _metrics_from_counts(true_positives, len(gold_entities), len(pred_entities))
 
 
 def compute_per_type_metrics(gold_entities: List[Entity],
-                             pred_entities: List[Entity]) -> Dict:
+                             pred_entities: List[Entity],
+                             *,
+                             tp_set: Set[Entity] = None) -> Dict:
     """Compute metrics broken down by entity type."""
-    # Group by type
-    gold_by_type = defaultdict(list)
-    pred_by_type = defaultdict(list)
+    if tp_set is None:
+        tp_set = set(gold_entities) & set(pred_entities)
 
-    for ent in gold_entities:
-        gold_by_type[ent.type].append(ent)
-    for ent in pred_entities:
-        pred_by_type[ent.type].append(ent)
+    # Exact matches agree on type, so one intersection serves every type
+    gold_counts = Counter(ent.type for ent in gold_entities)
+    pred_counts = Counter(ent.type for ent in pred_entities)
+    tp_counts = Counter(ent.type for ent in tp_set)
 
-    # Get all types
-    all_types = set(gold_by_type.keys()) | set(pred_by_type.keys())
-
-    results = {}
-    for etype in sorted(all_types):
-        gold = gold_by_type[etype]
-        pred = pred_by_type[etype]
-        results[etype] = compute_metrics(gold, pred, match_type='exact')
-
-    return results
+    return {
+        etype: _metrics_from_counts(tp_counts[etype], gold_counts[etype], pred_counts[etype])
+        for etype in sorted(gold_counts.keys() | pred_counts.keys())
+    }
 
 
 def analyze_errors(gold_entities: List[Entity],
-                   pred_entities: List[Entity]) -> Dict:
+                   pred_entities: List[Entity],
+                   *,
+                   gold_set: Set[Entity] = None,
+                   pred_set: Set[Entity] = None,
+                   gold_index: Dict = None) -> Dict:
     """Detailed error analysis."""
-    # Convert to sets for exact matching
-    gold_set = set(gold_entities)
-    pred_set = set(pred_entities)
+    # Convert to sets for exact matching, unless the caller already has them
+    if gold_set is None:
+        gold_set = set(gold_entities)
+    if pred_set is None:
+        pred_set = set(pred_entities)
 
     # False positives: predicted but not in gold
     false_positives = pred_set - gold_set
@@ -157,19 +249,24 @@ def analyze_errors(gold_entities: List[Entity],
     false_negatives = gold_set - pred_set
 
     # Boundary errors: overlap with gold but different boundaries
+    if gold_index is None:
+        gold_index = _build_span_index(gold_entities)
     boundary_errors = []
     for pred in pred_entities:
         if pred not in gold_set:
-            for gold in gold_entities:
-                if pred.overlaps(gold) and pred.type == gold.type:
-                    boundary_errors.append((pred, gold))
-                    break
+            hits = _overlapping(gold_index, pred)
+            if hits:
+                boundary_errors.append((pred, gold_entities[min(hits)]))
 
     # Type errors: same boundaries but wrong type
+    gold_by_span = defaultdict(list)
+    for gold in gold_entities:
+        gold_by_span[(gold.start, gold.end)].append(gold)
+
     type_errors = []
     for pred in pred_entities:
-        for gold in gold_entities:
-            if pred.start == gold.start and pred.end == gold.end and pred.type != gold.type:
+        for gold in gold_by_span.get((pred.start, pred.end), ()):
+            if pred.type != gold.type:
                 type_errors.append((pred, gold))
                 break
 
@@ -232,11 +329,18 @@ def evaluate_document(gold_data: Dict, pred_data: Dict) -> Dict:
             'metrics': snippet_metrics
         })
 
-    # Overall metrics
-    overall_exact = compute_metrics(all_gold_entities, all_pred_entities, 'exact')
-    overall_partial = compute_metrics(all_gold_entities, all_pred_entities, 'partial')
-    per_type = compute_per_type_metrics(all_gold_entities, all_pred_entities)
-    errors = analyze_errors(all_gold_entities, all_pred_entities)
+    # Overall metrics (build the match sets and overlap index once and share them)
+    gold_set = set(all_gold_entities)
+    pred_set = set(all_pred_entities)
+    tp_set = gold_set & pred_set
+    gold_index = _build_span_index(all_gold_entities)
+
+    overall_exact = compute_metrics(all_gold_entities, all_pred_entities, 'exact', tp_set=tp_set)
+    overall_partial = compute_metrics(all_gold_entities, all_pred_entities, 'partial',
+                                      gold_index=gold_index)
+    per_type = compute_per_type_metrics(all_gold_entities, all_pred_entities, tp_set=tp_set)
+    errors = analyze_errors(all_gold_entities, all_pred_entities,
+                            gold_set=gold_set, pred_set=pred_set, gold_index=gold_index)
 
     return {
         'document_id': doc_id,
@@ -248,11 +352,18 @@ def evaluate_document(gold_data: Dict, pred_data: Dict) -> Dict:
     }
 
 
+def evaluate_document_pair(pair: Tuple[Dict, Dict]) -> Dict:
+    """evaluate_document for a (gold_data, pred_data) pair; used as a pool task."""
+    return evaluate_document(*pair)
+
+
 def print_metrics_report(results: List[Dict], model_name: str):
     """Print human-readable evaluation report."""
-    print(f"\n{'='*80}")
-    print(f"NER EVALUATION REPORT: {model_name}")
-    print(f"{'='*80}\n")
+    out = io.StringIO()  # Emitted with a single write at the end
+
+    print(f"\n{'='*80}", file=out)
+    print(f"NER EVALUATION REPORT: {model_name}", file=out)
+    print(f"{'='*80}\n", file=out)
 
     # Aggregate metrics
     total_gold = sum(r['overall_exact']['total_gold'] for r in results)
@@ -261,60 +372,56 @@ def print_metrics_report(results: List[Dict], model_name: str):
     total_fp = sum(r['overall_exact']['false_positives'] for r in results)
     total_fn = sum(r['overall_exact']['false_negatives'] for r in results)
 
-    precision = total_tp / total_pred if total_pred > 0 else 0
-    recall = total_tp / total_gold if total_gold > 0 else 0
-    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0
+    precision, recall, f1 = _prf(total_tp, total_pred, total_gold)
 
-    print(f"Overall Performance (Exact Match):")
-    print(f"  Precision: {precision:.3f}")
-    print(f"  Recall:    {recall:.3f}")
-    print(f"  F1 Score:  {f1:.3f}")
-    print(f"\n  True Positives:  {total_tp}")
-    print(f"  False Positives: {total_fp}")
-    print(f"  False Negatives: {total_fn}")
-    print(f"  Total Gold:      {total_gold}")
-    print(f"  Total Predicted: {total_pred}")
+    print(f"Overall Performance (Exact Match):", file=out)
+    print(f"  Precision: {precision:.3f}", file=out)
+    print(f"  Recall:    {recall:.3f}", file=out)
+    print(f"  F1 Score:  {f1:.3f}", file=out)
+    print(f"\n  True Positives:  {total_tp}", file=out)
+    print(f"  False Positives: {total_fp}", file=out)
+    print(f"  False Negatives: {total_fn}", file=out)
+    print(f"  Total Gold:      {total_gold}", file=out)
+    print(f"  Total Predicted: {total_pred}", file=out)
 
     # Per-type metrics
-    print(f"\n{'-'*80}")
-    print(f"Per-Entity-Type Performance:")
-    print(f"{'-'*80}")
+    print(f"\n{'-'*80}", file=out)
+    print(f"Per-Entity-Type Performance:", file=out)
+    print(f"{'-'*80}", file=out)
 
-    # Aggregate per-type metrics
-    type_metrics = defaultdict(lambda: {'tp': 0, 'fp': 0, 'fn': 0, 'gold': 0, 'pred': 0})
+    # Aggregate per-type counts
+    type_tp, type_gold, type_pred = Counter(), Counter(), Counter()
 
     for result in results:
         for etype, metrics in result['per_type'].items():
-            type_metrics[etype]['tp'] += metrics['true_positives']
-            type_metrics[etype]['fp'] += metrics['false_positives']
-            type_metrics[etype]['fn'] += metrics['false_negatives']
-            type_metrics[etype]['gold'] += metrics['total_gold']
-            type_metrics[etype]['pred'] += metrics['total_pred']
+            type_tp[etype] += metrics['true_positives']
+            type_gold[etype] += metrics['total_gold']
+            type_pred[etype] += metrics['total_pred']
 
-    print(f"{'Type':<8} {'Precision':<12} {'Recall':<12} {'F1':<12} {'Gold':<8} {'Pred':<8}")
-    print(f"{'-'*70}")
+    print(f"{'Type':<8} {'Precision':<12} {'Recall':<12} {'F1':<12} {'Gold':<8} {'Pred':<8}", file=out)
+    print(f"{'-'*70}", file=out)
 
-    for etype in sorted(type_metrics.keys()):
-        m = type_metrics[etype]
-        p = m['tp'] / m['pred'] if m['pred'] > 0 else 0
-        r = m['tp'] / m['gold'] if m['gold'] > 0 else 0
-        f = 2 * p * r / (p + r) if (p + r) > 0 else 0
+    for etype in sorted(type_gold.keys() | type_pred.keys()):
+        gold, pred = type_gold[etype], type_pred[etype]
+        p, r, f = _prf(type_tp[etype], pred, gold)
 
-        print(f"{etype:<8} {p:<12.3f} {r:<12.3f} {f:<12.3f} {m['gold']:<8} {m['pred']:<8}")
+        print(f"{etype:<8} {p:<12.3f} {r:<12.3f} {f:<12.3f} {gold:<8} {pred:<8}", file=out)
 
     # Per-document summary
-    print(f"\n{'-'*80}")
-    print(f"Per-Document Performance:")
-    print(f"{'-'*80}")
-    print(f"{'Document':<35} {'Precision':<12} {'Recall':<12} {'F1':<12}")
-    print(f"{'-'*70}")
+    print(f"\n{'-'*80}", file=out)
+    print(f"Per-Document Performance:", file=out)
+    print(f"{'-'*80}", file=out)
+    print(f"{'Document':<35} {'Precision':<12} {'Recall':<12} {'F1':<12}", file=out)
+    print(f"{'-'*70}", file=out)
 
     for result in results:
         doc_id = result['document_id']
         m = result['overall_exact']
-        print(f"{doc_id:<35} {m['precision']:<12.3f} {m['recall']:<12.3f} {m['f1']:<12.3f}")
+        print(f"{doc_id:<35} {m['precision']:<12.3f} {m['recall']:<12.3f} {m['f1']:<12.3f}", file=out)
+
+    print(f"\n{'='*80}\n", file=out)
 
-    print(f"\n{'='*80}\n")
+    sys.stdout.write(out.getvalue())
 
 
 def main():
@@ -327,8 +434,12 @@ def main():
                         help='Directory with prediction files (default: test_dataset/predictions/{model_name} relative to this script)')
     parser.add_argument('--output', default=None,
                         help='Output JSON file for detailed results')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes used to evaluate documents (default: CPU count; 1 disables multiprocessing)')
 
     args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
 
     # Resolve default paths relative to repository layout regardless of CWD
     script_dir = Path(__file__).parent
@@ -356,7 +467,8 @@ def main():
     print(f"Predictions:   {pred_dir}")
     print(f"Documents:     {len(gold_files)}\n")
 
-    results = []
+    doc_ids = []
+    file_pairs = []
 
     for gold_file in sorted(gold_files):
         doc_id = gold_file.stem.replace('_gold', '')
@@ -366,13 +478,24 @@ def main():
             print(f"WARNING: No predictions found for {doc_id}, skipping")
             continue
 
-        print(f"Evaluating {doc_id}...")
+        doc_ids.append(doc_id)
+        file_pairs.append((gold_file, pred_file))
 
-        gold_data = load_gold_standard(gold_file)
-        pred_data = load_predictions(pred_file)
+    # Many small files: overlap their reads, then evaluate in order
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        loaded = list(executor.map(load_document_pair, file_pairs))
 
-        result = evaluate_document(gold_data, pred_data)
-        results.append(result)
+    # Documents are independent, so CPU-bound evaluation fans out across processes
+    results = []
+    if args.workers == 1 or len(loaded) < 2:
+        for doc_id, pair in zip(doc_ids, loaded):
+            print(f"Evaluating {doc_id}...")
+            results.append(evaluate_document_pair(pair))
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            for doc_id, result in zip(doc_ids, executor.map(evaluate_document_pair, loaded)):
+                print(f"Evaluated {doc_id}")
+                results.append(result)
 
     if not results:
         print("ERROR: No documents were evaluated")
@@ -389,13 +512,12 @@ def main():
 
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'model_name': args.model_name,
-            'evaluation_date': datetime.now().isoformat(),
-            'total_documents': len(results),
-            'results': results
-        }, f, indent=2, ensure_ascii=False)
+    output_file.write_bytes(_dumps({
+        'model_name': args.model_name,
+        'evaluation_date': datetime.now().isoformat(),
+        'total_documents': len(results),
+        'results': results
+    }))
 
     print(f"Detailed results saved to: {output_file}")
 
@@ -403,5 +525,4 @@ def main():
 
 
 if __name__ == '__main__':
-    from datetime import datetime
     sys.exit(main())
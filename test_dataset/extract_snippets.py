@@ -9,14 +9,44 @@ Strategy:
 - Focus on high entity density passages (mentions of places, people, orgs)
 """
 
+import io
 import json
+import mmap
+import os
 import re
 import sys
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict, Tuple
 import random
 import argparse
 
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    def _load_json_file(path: Path):
+        # orjson parses straight from the mapped file, without a bytes copy
+        with open(path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                memoryview(mm) as view:
+            return orjson.loads(view)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+    def _load_json_file(path: Path):
+        return json.loads(path.read_bytes())
+
 # Set random seed for reproducibility
 random.seed(42)
 
@@ -25,20 +55,33 @@ MIN_SNIPPET_LENGTH = 300  # characters
 MAX_SNIPPET_LENGTH = 1200  # characters
 TARGET_SNIPPET_LENGTH = 800  # characters
 
+# Entity-density patterns
+_CAP_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*')
+_TITLES_RE = re.compile(r'\b(Mr\.|Mrs\.|Dr\.|Sir|Lady|Chief|Father|Mgr|Rev\.)\s+[A-Z]')
+
+# Document type from identifier prefixes (checked in this order)
+_NEWSPAPER_RE = re.compile(r'ptr_|bdm_|brm_|lmt_|mja_|mtm_', re.IGNORECASE)
+_GOV_RE = re.compile(r'school_files|rg10', re.IGNORECASE)
+
+# Geographic indicators (matched case-insensitively as substrings)
+_GEO_TERMS = ('river', 'lake', 'fort', 'mountain', 'prairie', 'settlement',
+              'territory', 'district', 'creek', 'hill', 'bay', 'island',
+              'rivière', 'lac', 'montagne', 'territoire')
+
+# Organization indicators (matched case-sensitively as substrings)
+_ORG_TERMS = ('Company', 'Association', 'Department', 'Commission', 'Police',
+              'Compagnie', 'Société')
+
 
 def load_ocr_document(ocr_path: Path) -> Tuple[str, dict]:
     """Load OCR JSON and return full text and metadata."""
-    with open(ocr_path, 'r') as f:
-        data = json.load(f)
+    data = _load_json_file(ocr_path)
 
     if not data or len(data) == 0:
         return "", {}
 
-    # Concatenate all page texts
-    full_text = ""
-    for page in data:
-        if 'text' in page:
-            full_text += page['text'] + "\n\n"
+    # Concatenate all page texts, each followed by a blank line
+    full_text = "".join(page['text'] + "\n\n" for page in data if 'text' in page)
 
     # Get metadata from first page
     metadata = data[0].get('metadata', {}) if data else {}
@@ -51,45 +94,118 @@ def load_ocr_document(ocr_path: Path) -> Tuple[str, dict]:
     }
 
 
+# Counts at which each indicator's contribution to the density score is
+# capped; counting further cannot change the score
+_CAP_WORDS_SATURATION = 15   # 15 / 50 = 0.3
+_GEO_SATURATION = 3          # 3 / 10 = 0.3
+_TITLES_SATURATION = 2       # 2 / 10 = 0.2
+_ORG_SATURATION = 1          # 1 / 5 = 0.2
+
+
+def _count_matches_upto(pattern: re.Pattern, text: str, limit: int,
+                        pos: int = 0, endpos: int = sys.maxsize) -> int:
+    """Count matches of pattern in text[pos:endpos], stopping at limit."""
+    return sum(1 for _ in islice(pattern.finditer(text, pos, endpos), limit))
+
+
+def _count_terms_upto(haystack: str, terms, limit: int) -> int:
+    """Count occurrences of terms in haystack, stopping once limit is reached."""
+    count = 0
+    for term in terms:
+        count += haystack.count(term)
+        if count >= limit:
+            break
+    return count
+
+
+def _density_from_counts(cap_words: int, geo_count: int, titles: int, org_count: int) -> float:
+    """Combine entity-indicator counts into a 0-1 density score."""
+    score = 0.0
+    score += min(cap_words / 50, 0.3)
+    score += min(geo_count / 10, 0.3)
+    score += min(titles / 10, 0.2)
+    score += min(org_count / 5, 0.2)
+    return min(score, 1.0)
+
+
 def estimate_entity_density(text: str) -> float:
     """
     Estimate entity density in text using heuristics.
     Returns score 0-1 indicating likely entity richness.
     """
-    score = 0.0
+    # Each count stops at the point where its score contribution saturates
 
     # Capitalized words (potential entities)
-    cap_words = len(re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*', text))
-    score += min(cap_words / 50, 0.3)
+    cap_words = _count_matches_upto(_CAP_RE, text, _CAP_WORDS_SATURATION)
 
     # Geographic indicators
-    geo_terms = ['river', 'lake', 'fort', 'mountain', 'prairie', 'settlement',
-                 'territory', 'district', 'creek', 'hill', 'bay', 'island',
-                 'rivière', 'lac', 'montagne', 'territoire']
-    geo_count = sum(text.lower().count(term) for term in geo_terms)
-    score += min(geo_count / 10, 0.3)
+    geo_count = _count_terms_upto(text.lower(), _GEO_TERMS, _GEO_SATURATION)
 
     # Proper name patterns (e.g., "Mr. Smith", "Sir John")
-    titles = len(re.findall(r'\b(Mr\.|Mrs\.|Dr\.|Sir|Lady|Chief|Father|Mgr|Rev\.)\s+[A-Z]', text))
-    score += min(titles / 10, 0.2)
+    titles = _count_matches_upto(_TITLES_RE, text, _TITLES_SATURATION)
 
     # Organization indicators
-    org_terms = ['Company', 'Association', 'Department', 'Commission', 'Police',
-                 'Compagnie', 'Société']
-    org_count = sum(text.count(term) for term in org_terms)
-    score += min(org_count / 5, 0.2)
+    org_count = _count_terms_upto(text, _ORG_TERMS, _ORG_SATURATION)
+
+    return _density_from_counts(cap_words, geo_count, titles, org_count)
 
-    return min(score, 1.0)
+
+def _literal_spans(haystack: str, terms) -> List[Tuple[int, int]]:
+    """Return (start, end) of every non-overlapping occurrence of each term."""
+    spans = []
+    for term in terms:
+        n = len(term)
+        i = haystack.find(term)
+        while i != -1:
+            spans.append((i, i + n))
+            i = haystack.find(term, i + n)
+    return spans
+
+
+def _boundary_prefix_counts(spans: List[Tuple[int, int]],
+                            boundaries: List[int]) -> Tuple[List[int], List[int]]:
+    """
+    Prefix counts of spans relative to each boundary.
+
+    Returns (ends_upto, starts_before): the number of spans ending at or
+    before boundaries[k], and the number starting before it. The spans lying
+    inside [boundaries[i], boundaries[j]) then number
+    ends_upto[j] - starts_before[i].
+    """
+    starts = sorted(start for start, _ in spans)
+    ends = sorted(end for _, end in spans)
+    ends_upto = [bisect_right(ends, b) for b in boundaries]
+    starts_before = [bisect_left(starts, b) for b in boundaries]
+    return ends_upto, starts_before
+
+
+def _stripped_bounds(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Bounds of text[start:end].strip() within text, without slicing."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
 
 
 def extract_sentence_boundaries(text: str) -> List[int]:
     """Find sentence boundaries in text (approximate)."""
-    # Simple sentence boundary detection
-    boundaries = [0]
-    for match in re.finditer(r'[.!?]\s+[A-Z]', text):
-        boundaries.append(match.start() + 2)
-    boundaries.append(len(text))
-    return boundaries
+    # Simple sentence boundary detection: terminal punctuation, whitespace,
+    # then a capital letter (matches of r'[.!?]\s+[A-Z]'). Jumping between
+    # punctuation marks with str.find beats running the regex over every char.
+    n = len(text)
+    found = []
+    for mark in '.!?':
+        i = text.find(mark)
+        while i != -1:
+            j = i + 1
+            while j < n and text[j].isspace():
+                j += 1
+            if j > i + 1 and j < n and 'A' <= text[j] <= 'Z':
+                found.append(i + 2)
+            i = text.find(mark, i + 1)
+    found.sort()
+    return [0, *found, n]
 
 
 def extract_snippets(text: str, num_snippets: int) -> List[Dict]:
@@ -119,37 +235,60 @@ def extract_snippets(text: str, num_snippets: int) -> List[Dict]:
 
     # Split into potential snippets with overlap
     sentence_boundaries = extract_sentence_boundaries(text)
-
-    # Create candidate snippets
+    num_boundaries = len(sentence_boundaries)
+
+    # Candidates start and end on sentence boundaries, which capitalized-word
+    # runs and keywords never straddle. Their counts can therefore be found once
+    # for the whole text and summed per candidate with prefix counts. Title
+    # matches can straddle a boundary ("Rev. Father ..."), so they are still
+    # counted per candidate. Fall back to scoring each candidate if lowercasing
+    # shifts character offsets.
+    lowered = text.lower()
+    use_prefix_counts = len(lowered) == len(text)
+    if use_prefix_counts:
+        cap_prefix = _boundary_prefix_counts(
+            [m.span() for m in _CAP_RE.finditer(text)], sentence_boundaries)
+        geo_prefix = _boundary_prefix_counts(
+            _literal_spans(lowered, _GEO_TERMS), sentence_boundaries)
+        org_prefix = _boundary_prefix_counts(
+            _literal_spans(text, _ORG_TERMS), sentence_boundaries)
+
+    # Create candidate snippets as (char_start, char_end, density); text is
+    # only sliced for the windows that end up selected
     candidates = []
     for i, start_boundary in enumerate(sentence_boundaries[:-1]):
         # Build snippet of approximately TARGET_SNIPPET_LENGTH
         char_start = start_boundary
         char_end = start_boundary
+        end_index = i
 
         # Extend to target length
-        for end_boundary in sentence_boundaries[i+1:]:
+        for j in range(i + 1, num_boundaries):
+            end_boundary = sentence_boundaries[j]
             if end_boundary - start_boundary >= MIN_SNIPPET_LENGTH:
                 char_end = end_boundary
+                end_index = j
                 if end_boundary - start_boundary >= TARGET_SNIPPET_LENGTH:
                     break
 
         if char_end - char_start < MIN_SNIPPET_LENGTH:
             continue
 
-        snippet_text = text[char_start:char_end].strip()
-        if len(snippet_text) < MIN_SNIPPET_LENGTH:
+        strip_start, strip_end = _stripped_bounds(text, char_start, char_end)
+        if strip_end - strip_start < MIN_SNIPPET_LENGTH:
             continue
 
-        density = estimate_entity_density(snippet_text)
+        if use_prefix_counts:
+            density = _density_from_counts(
+                cap_prefix[0][end_index] - cap_prefix[1][i],
+                geo_prefix[0][end_index] - geo_prefix[1][i],
+                _count_matches_upto(_TITLES_RE, text, _TITLES_SATURATION,
+                                    char_start, char_end),
+                org_prefix[0][end_index] - org_prefix[1][i])
+        else:
+            density = estimate_entity_density(text[strip_start:strip_end])
 
-        candidates.append({
-            'char_start': char_start,
-            'char_end': char_end,
-            'text': snippet_text,
-            'density': density,
-            'length': len(snippet_text)
-        })
+        candidates.append((char_start, char_end, density))
 
     if not candidates:
         # Fallback: just split into chunks
@@ -159,46 +298,42 @@ def extract_snippets(text: str, num_snippets: int) -> List[Dict]:
             end = min(i + chunk_size, len(text))
             snippet_text = text[i:end].strip()
             if len(snippet_text) >= MIN_SNIPPET_LENGTH:
-                candidates.append({
-                    'char_start': i,
-                    'char_end': end,
-                    'text': snippet_text,
-                    'density': estimate_entity_density(snippet_text),
-                    'length': len(snippet_text)
-                })
+                candidates.append((i, end, estimate_entity_density(snippet_text)))
 
     # Sort by entity density (descending)
-    candidates.sort(key=lambda x: x['density'], reverse=True)
+    candidates.sort(key=itemgetter(2), reverse=True)
 
-    # Select top N non-overlapping snippets
+    # Select top N non-overlapping snippets. Selected spans are kept sorted by
+    # start, so only the neighbours at the insertion point can overlap.
     selected = []
+    sel_starts = []
+    sel_ends = []
     for candidate in candidates:
-        # Check for overlap with already selected
-        overlap = False
-        for sel in selected:
-            if not (candidate['char_end'] <= sel['char_start'] or
-                    candidate['char_start'] >= sel['char_end']):
-                overlap = True
-                break
+        cand_start, cand_end, _ = candidate
+        k = bisect_right(sel_starts, cand_start)
+        overlap = ((k > 0 and sel_ends[k - 1] > cand_start) or
+                   (k < len(sel_starts) and sel_starts[k] < cand_end))
 
         if not overlap:
             selected.append(candidate)
+            sel_starts.insert(k, cand_start)
+            sel_ends.insert(k, cand_end)
 
         if len(selected) >= num_snippets:
             break
 
     # Sort selected by position in document
-    selected.sort(key=lambda x: x['char_start'])
+    selected.sort()
 
     # Format output
     snippets = []
-    for i, snip in enumerate(selected, 1):
+    for i, (char_start, char_end, density) in enumerate(selected, 1):
         snippets.append({
             'snippet_id': i,
-            'text': snip['text'],
-            'char_start': snip['char_start'],
-            'char_end': snip['char_end'],
-            'entity_density_score': round(snip['density'], 3)
+            'text': text[char_start:char_end].strip(),
+            'char_start': char_start,
+            'char_end': char_end,
+            'entity_density_score': round(density, 3)
         })
 
     return snippets
@@ -256,6 +391,23 @@ def process_document(doc_id: str, ocr_path: Path, doc_metadata: Dict) -> Dict:
     return output
 
 
+def _work(task: Tuple[str, Path, Dict, Path]) -> Tuple[Dict, str]:
+    """
+    Process one document and save its snippet file (process pool worker).
+
+    Progress messages are captured and returned so the parent can print each
+    document's log in sample order.
+    """
+    doc_id, ocr_path, doc_metadata, output_file = task
+    log = io.StringIO()
+    with redirect_stderr(log):
+        result = process_document(doc_id, ocr_path, doc_metadata)
+        if result:
+            output_file.write_bytes(_dumps(result))
+            print(f"  Saved to {output_file}\n", file=sys.stderr)
+    return result, log.getvalue()
+
+
 def main():
     """Main extraction process."""
     parser = argparse.ArgumentParser(description='Extract representative OCR snippets for NER annotation')
@@ -263,7 +415,11 @@ def main():
                         help='File with one identifier per line (default: test_dataset/ids.txt relative to this script)')
     parser.add_argument('--subcollection', default='saskatchewan_1808_1946',
                         help='Subcollection to read OCR from (default: saskatchewan_1808_1946)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes used to extract documents (default: CPU count; 1 disables multiprocessing)')
     args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
 
     base_dir = Path(__file__).parent.parent  # export_bundle
     test_dir = base_dir / 'test_dataset'
@@ -280,12 +436,17 @@ def main():
 
     print(f"Processing {len(sample_ids)} documents...\n", file=sys.stderr)
 
-    # Load document metadata from documents.jsonl
+    # Load document metadata from documents.jsonl. Only sampled documents are
+    # needed, and lines from other subcollections are skipped before parsing.
+    wanted_ids = set(sample_ids)
     doc_metadata_map = {}
-    with open(base_dir / 'documents.jsonl', 'r') as f:
+    with open(base_dir / 'documents.jsonl', 'rb') as f:
         for line in f:
-            doc = json.loads(line)
-            if doc.get('subcollection') == 'saskatchewan_1808_1946':
+            if b'saskatchewan_1808_1946' not in line:
+                continue
+            doc = _loads(line)
+            if (doc.get('subcollection') == 'saskatchewan_1808_1946' and
+                    doc['identifier'] in wanted_ids):
                 doc_metadata_map[doc['identifier']] = {
                     'title': doc.get('title', ''),
                     'year': doc.get('year'),
@@ -297,37 +458,57 @@ def main():
     # Ensure output dir exists
     (test_dir / 'snippets').mkdir(parents=True, exist_ok=True)
 
-    # Process each document
-    results = []
+    # List the OCR directory once instead of stat-ing each sampled file
+    ocr_dir = base_dir / 'ocr' / args.subcollection
+    try:
+        with os.scandir(ocr_dir) as entries:
+            ocr_files = {e.name for e in entries if e.name.endswith('.json')}
+    except FileNotFoundError:
+        ocr_files = set()
+
+    # Collect documents to process
+    tasks = []
     for doc_id in sample_ids:
         if doc_id not in doc_metadata_map:
             print(f"WARNING: No metadata found for {doc_id}", file=sys.stderr)
             continue
 
         ocr_path = base_dir / f'ocr/{args.subcollection}/{doc_id}.json'
-        if not ocr_path.exists():
+        if f'{doc_id}.json' not in ocr_files:
             print(f"WARNING: OCR file not found: {ocr_path}", file=sys.stderr)
             continue
 
         doc_metadata = doc_metadata_map[doc_id]
 
         # Infer document type
-        if any(x in doc_id.lower() for x in ['ptr_', 'bdm_', 'brm_', 'lmt_', 'mja_', 'mtm_']):
+        if _NEWSPAPER_RE.search(doc_id):
             doc_metadata['doc_type'] = 'newspaper'
-        elif 'school_files' in doc_id.lower() or 'rg10' in doc_id.lower():
+        elif _GOV_RE.search(doc_id):
             doc_metadata['doc_type'] = 'government'
         else:
             doc_metadata['doc_type'] = 'book'
 
-        result = process_document(doc_id, ocr_path, doc_metadata)
-        if result:
-            results.append(result)
+        output_file = test_dir / 'snippets' / f'{doc_id}_snippets.json'
+        tasks.append((doc_id, ocr_path, doc_metadata, output_file))
 
-            # Save individual snippet file
-            output_file = test_dir / 'snippets' / f'{doc_id}_snippets.json'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
-            print(f"  Saved to {output_file}\n", file=sys.stderr)
+    # Documents are independent, so extraction fans out across processes;
+    # each document's log is printed in sample order as results arrive
+    if args.workers == 1 or len(tasks) < 2:
+        outcomes = map(_work, tasks)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=args.workers)
+        outcomes = executor.map(_work, tasks, chunksize=4)
+
+    results = []
+    try:
+        for result, log in outcomes:
+            sys.stderr.write(log)
+            if result:
+                results.append(result)
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
     # Save summary
     summary = {
@@ -348,8 +529,7 @@ def main():
     }
 
     summary_file = test_dir / 'snippets/SUMMARY.json'
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    summary_file.write_bytes(_dumps(summary))
 
     print(f"\n{'='*60}", file=sys.stderr)
     print(f"EXTRACTION COMPLETE", file=sys.stderr)
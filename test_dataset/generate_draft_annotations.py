@@ -12,19 +12,33 @@ If no document_id provided, processes all documents.
 """
 
 import json
+import os
 import sys
 from pathlib import Path
 from typing import List, Dict
 from datetime import datetime
 
-# Try to import spaCy
 try:
-    import spacy
-    SPACY_AVAILABLE = True
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    def _dumps_line(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
 except ImportError:
-    SPACY_AVAILABLE = False
-    print("Warning: spaCy not available. Install with: pip install spacy")
-    print("         Then download model: python -m spacy download en_core_web_sm")
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+    def _dumps_line(obj) -> bytes:
+        return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
+# spaCy is slow to import, so it is imported on first use in load_spacy_model;
+# None until then
+SPACY_AVAILABLE = None
 
 
 ENTITY_TYPE_MAP = {
@@ -38,15 +52,46 @@ ENTITY_TYPE_MAP = {
     'LAW': 'MISC',     # Named documents/laws/treaties
 }
 
+# Draft notes depend only on the spaCy label, so build each string once
+SPACY_NOTES = {label: f'Auto-detected by spaCy as {label}' for label in ENTITY_TYPE_MAP}
+
+# Only the NER component (and its tok2vec) is needed for drafts
+SPACY_DISABLED_PIPES = ["parser", "lemmatizer", "attribute_ruler"]
+SPACY_BATCH_SIZE = 32
+
+# Transformer model used when a GPU is available; larger batches keep it busy
+SPACY_GPU_MODEL = "en_core_web_trf"
+SPACY_GPU_BATCH_SIZE = 64
+
 
 def load_spacy_model():
     """Load spaCy model for entity recognition."""
-    if not SPACY_AVAILABLE:
+    global SPACY_AVAILABLE
+
+    # Try to import spaCy
+    try:
+        import spacy
+        SPACY_AVAILABLE = True
+    except ImportError:
+        SPACY_AVAILABLE = False
+        print("Warning: spaCy not available. Install with: pip install spacy")
+        print("         Then download model: python -m spacy download en_core_web_sm")
         return None
 
+    # On GPU, prefer the transformer model; fall back to the small CPU model
+    if spacy.prefer_gpu():
+        try:
+            nlp = spacy.load(SPACY_GPU_MODEL, disable=SPACY_DISABLED_PIPES)
+            nlp.batch_size = SPACY_GPU_BATCH_SIZE
+            print(f"✓ Loaded spaCy model on GPU: {SPACY_GPU_MODEL}")
+            return nlp
+        except OSError:
+            print(f"Note: {SPACY_GPU_MODEL} not installed, using en_core_web_sm")
+
     try:
         # Try to load English model
-        nlp = spacy.load("en_core_web_sm")
+        nlp = spacy.load("en_core_web_sm", disable=SPACY_DISABLED_PIPES)
+        nlp.batch_size = SPACY_BATCH_SIZE
         print("✓ Loaded spaCy model: en_core_web_sm")
         return nlp
     except OSError:
@@ -60,25 +105,29 @@ def annotate_with_spacy(text: str, nlp) -> List[Dict]:
     if nlp is None:
         return []
 
-    doc = nlp(text)
+    return _entities_from_doc(nlp(text))
+
+
+def _entities_from_doc(doc) -> List[Dict]:
+    """Convert the entities of a processed spaCy Doc to draft annotations."""
     entities = []
 
     for ent in doc.ents:
         # Map spaCy entity type to our taxonomy
-        entity_type = ENTITY_TYPE_MAP.get(ent.label_, None)
+        label = ent.label_
+        entity_type = ENTITY_TYPE_MAP.get(label, None)
 
         if entity_type:
-            entity = {
+            entities.append({
                 'text': ent.text,
                 'start': ent.start_char,
                 'end': ent.end_char,
                 'type': entity_type,
                 'confidence': 0.8,  # Draft confidence
                 'source': 'spacy',
-                'original_type': ent.label_,
-                'notes': f'Auto-detected by spaCy as {ent.label_}'
-            }
-            entities.append(entity)
+                'original_type': label,
+                'notes': SPACY_NOTES[label]
+            })
 
     return entities
 
@@ -90,8 +139,47 @@ def load_snippets(doc_id: str) -> Dict:
         print(f"ERROR: Snippets file not found: {snippets_file}")
         return None
 
-    with open(snippets_file, 'r') as f:
-        return json.load(f)
+    return _loads(snippets_file.read_bytes())
+
+
+def load_draft_index(draft_dir: Path) -> Dict:
+    """Latest drafts/INDEX.jsonl record per document ({} if there is no index)."""
+    index_file = draft_dir / 'INDEX.jsonl'
+    if not index_file.exists():
+        return {}
+
+    index = {}
+    for line in index_file.read_bytes().splitlines():
+        if line.strip():
+            record = _loads(line)
+            index[record['doc_id']] = record
+    return index
+
+
+def update_draft_index(draft_dir: Path, doc_id: str, output: Dict, output_file: Path):
+    """
+    Record a draft's summary fields in drafts/INDEX.jsonl.
+
+    Listing tools read this index instead of parsing every draft. The draft's
+    mtime is stored so stale records (draft rewritten elsewhere) are detected.
+    The index is rewritten with one record per existing draft, so it does not
+    grow with every regeneration.
+    """
+    index = load_draft_index(draft_dir)
+    index[doc_id] = {
+        'doc_id': doc_id,
+        'total_entities': output['total_entities'],
+        'language': output['metadata'].get('language', 'unknown'),
+        'mtime_ns': output_file.stat().st_mtime_ns
+    }
+
+    index_file = draft_dir / 'INDEX.jsonl'
+    tmp_file = index_file.with_name(index_file.name + '.tmp')
+    tmp_file.write_bytes(b''.join(
+        _dumps_line(record) for record in index.values()
+        if (draft_dir / f"{record['doc_id']}_draft.json").exists()
+    ))
+    os.replace(tmp_file, index_file)
 
 
 def generate_draft_for_document(doc_id: str, nlp) -> bool:
@@ -106,13 +194,17 @@ def generate_draft_for_document(doc_id: str, nlp) -> bool:
     snippets = data['snippets']
     print(f"  {len(snippets)} snippets to annotate")
 
-    # Annotate each snippet
+    # Annotate all snippets in batches through spaCy (batch size set at load)
+    texts = [snippet['text'] for snippet in snippets]
+    if nlp is not None:
+        entity_lists = [_entities_from_doc(doc) for doc in nlp.pipe(texts)]
+    else:
+        entity_lists = [[] for _ in texts]
+
     draft_snippets = []
     total_entities = 0
 
-    for snippet in snippets:
-        entities = annotate_with_spacy(snippet['text'], nlp)
-
+    for snippet, entities in zip(snippets, entity_lists):
         draft_snippet = {
             'snippet_id': f"{snippet['snippet_id']:03d}",
             'text': snippet['text'],
@@ -130,7 +222,7 @@ def generate_draft_for_document(doc_id: str, nlp) -> bool:
         'metadata': data['metadata'],
         'annotation_date': datetime.now().isoformat(),
         'annotator': 'ai_draft',
-        'model': 'spacy_en_core_web_sm',
+        'model': f"spacy_{nlp.meta['lang']}_{nlp.meta['name']}" if nlp is not None else 'none',
         'status': 'draft',
         'total_snippets': len(draft_snippets),
         'total_entities': total_entities,
@@ -142,8 +234,8 @@ def generate_draft_for_document(doc_id: str, nlp) -> bool:
     draft_dir.mkdir(exist_ok=True)
 
     output_file = draft_dir / f'{doc_id}_draft.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    output_file.write_bytes(_dumps(output))
+    update_draft_index(draft_dir, doc_id, output, output_file)
 
     print(f"  ✓ Draft saved: {output_file}")
     print(f"    Entities detected: {total_entities}")
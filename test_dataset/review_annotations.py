@@ -14,6 +14,20 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+from generate_draft_annotations import load_draft_index
+
 
 ENTITY_TYPES = {
     'LOC': 'Location (places, regions, natural features)',
@@ -31,8 +45,7 @@ def load_draft(doc_id: str):
         print(f"\nAsk Claude to create draft annotations for: {doc_id}")
         sys.exit(1)
 
-    with open(draft_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return _loads(draft_file.read_bytes())
 
 
 def show_entity(text, entity, entity_num, total_entities, snippet_num):
@@ -101,6 +114,38 @@ def quick_review_entity(text, entity, entity_num, total_entities, snippet_num):
             print("Invalid. Use: y/n/m/s/q")
 
 
+def find_all_occurrences(text, entity_text):
+    """Start offsets of every occurrence of entity_text in text."""
+    positions = []
+    idx = text.find(entity_text)
+    while idx != -1:
+        positions.append(idx)
+        idx = text.find(entity_text, idx + 1)
+    return positions
+
+
+def choose_occurrences(text, entity_text, positions):
+    """Ask which occurrence(s) to annotate when the text appears more than once."""
+    if len(positions) == 1:
+        return positions
+
+    print(f"  Found {len(positions)} occurrences:")
+    for i, idx in enumerate(positions, 1):
+        before = text[max(0, idx - 30):idx].replace('\n', ' ')
+        after = text[idx + len(entity_text):idx + len(entity_text) + 30].replace('\n', ' ')
+        print(f"    {i}. ...{before}[{entity_text}]{after}...")
+
+    choice = input(f"  Which one? (1-{len(positions)}, a=all, Enter=1): ").strip().lower()
+    if choice == 'a':
+        return positions
+    if not choice:
+        return positions[:1]
+    if choice.isdigit() and 1 <= int(choice) <= len(positions):
+        return [positions[int(choice) - 1]]
+    print("  Invalid choice")
+    return []
+
+
 def add_missed_entities(text):
     """Add entities Claude missed."""
     print(f"\n{'='*80}")
@@ -114,12 +159,16 @@ def add_missed_entities(text):
         if not entity_text:
             break
 
-        # Find in text
-        idx = text.find(entity_text)
-        if idx == -1:
+        # Find every occurrence in text
+        positions = find_all_occurrences(text, entity_text)
+        if not positions:
             print(f"  Not found: '{entity_text}'")
             continue
 
+        positions = choose_occurrences(text, entity_text, positions)
+        if not positions:
+            continue
+
         # Get type
         print("  Types: LOC, PER, ORG, MISC")
         entity_type = input("  Type: ").strip().upper()
@@ -129,19 +178,21 @@ def add_missed_entities(text):
 
         notes = input("  Notes (optional): ").strip()
 
-        entity = {
-            'text': entity_text,
-            'start': idx,
-            'end': idx + len(entity_text),
-            'type': entity_type,
-            'confidence': 1.0,
-            'source': 'human_added',
-            'reviewed': True,
-            'notes': notes or 'Added during review'
-        }
-
-        new_entities.append(entity)
-        print(f"  ✓ Added: {entity_text} ({entity_type})")
+        for idx in positions:
+            entity = {
+                'text': entity_text,
+                'start': idx,
+                'end': idx + len(entity_text),
+                'type': entity_type,
+                'confidence': 1.0,
+                'source': 'human_added',
+                'reviewed': True,
+                'notes': notes or 'Added during review'
+            }
+
+            new_entities.append(entity)
+        print(f"  ✓ Added: {entity_text} ({entity_type})"
+              + (f" x{len(positions)}" if len(positions) > 1 else ""))
 
     return new_entities
 
@@ -205,8 +256,7 @@ def save_gold_standard(doc_id, metadata, reviewed_snippets):
     gold_dir.mkdir(exist_ok=True)
 
     output_file = gold_dir / f'{doc_id}_gold.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    output_file.write_bytes(_dumps(output))
 
     print(f"\n{'='*80}")
     print(f"✓ GOLD STANDARD SAVED")
@@ -249,15 +299,23 @@ def list_drafts():
     print(f"{'Document ID':<35} {'Entities':<10} {'Language':<10}")
     print("-" * 60)
 
+    # Use index records where they are current; parse only the other drafts
+    index = load_draft_index(draft_dir)
+
     doc_ids = []
     for draft_file in sorted(drafts):
-        with open(draft_file, 'r') as f:
-            data = json.load(f)
+        record = index.get(draft_file.name[:-len('_draft.json')])
+        if record is not None and record['mtime_ns'] == draft_file.stat().st_mtime_ns:
+            doc_id = record['doc_id']
+            entities = record['total_entities']
+            lang = record['language']
+        else:
+            data = _loads(draft_file.read_bytes())
             doc_id = data['document_id']
             entities = data.get('total_entities', 0)
             lang = data['metadata'].get('language', 'unknown')
-            print(f"{doc_id:<35} {entities:<10} {lang:<10}")
-            doc_ids.append(doc_id)
+        print(f"{doc_id:<35} {entities:<10} {lang:<10}")
+        doc_ids.append(doc_id)
 
     print(f"\nTotal: {len(drafts)} drafts ready for review")
     return doc_ids
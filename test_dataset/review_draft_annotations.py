@@ -7,15 +7,48 @@ with quick accept/reject/modify workflow.
 
 Usage:
     python review_draft_annotations.py [document_id]
+
+Each reviewed snippet is logged to gold_standard/{document_id}_gold.jsonl,
+so rerunning after an interruption resumes where the review stopped.
 """
 
 import json
+import os
 import sys
 import re
+import shlex
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    def _dumps_line(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+    def _dumps_line(obj) -> bytes:
+        return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+from generate_draft_annotations import load_draft_index
+
 
 ENTITY_TYPES = {
     'LOC': 'Location (places, regions, natural features)',
@@ -24,6 +57,34 @@ ENTITY_TYPES = {
     'MISC': 'Miscellaneous (indigenous groups, treaties, events)'
 }
 
+# Banner separators
+_EQ80 = '=' * 80
+_DASH80 = '─' * 80
+_HASH80 = '#' * 80
+_BAR50 = '-' * 50
+
+def _parse_draft(draft_file: Path) -> Dict:
+    """
+    Parse a draft file, making each entity's stored text match its span.
+
+    Displays trust entity['text'] afterwards instead of re-slicing the
+    snippet, so any drift between text and offsets is fixed here, once.
+    """
+    draft = _loads(draft_file.read_bytes())
+
+    fixed = 0
+    for snippet in draft.get('snippets', []):
+        text = snippet['text']
+        for entity in snippet['entities']:
+            span_text = text[entity['start']:entity['end']]
+            if entity.get('text') != span_text:
+                entity['text'] = span_text
+                fixed += 1
+    if fixed:
+        print(f"Note: corrected stored text of {fixed} entities in {draft_file} to match their offsets")
+
+    return draft
+
 
 def load_draft(doc_id: str) -> Dict:
     """Load draft annotations for a document."""
@@ -34,41 +95,135 @@ def load_draft(doc_id: str) -> Dict:
         print(f"  python generate_draft_annotations.py {doc_id}")
         sys.exit(1)
 
-    with open(draft_file, 'r') as f:
-        return json.load(f)
+    return _parse_draft(draft_file)
 
 
-def display_entity_in_context(text: str, entity: Dict, snippet_num: int, entity_num: int, total_entities: int):
+def display_entity_in_context(text: str, entity: Dict, snippet_num: int, entity_num: int, total_entities: int,
+                              text_len: int = None):
     """Display an entity with surrounding context for review."""
     start = entity['start']
     end = entity['end']
+    if text_len is None:
+        text_len = len(text)
 
     # Get context (50 chars before/after)
     context_start = max(0, start - 50)
-    context_end = min(len(text), end + 50)
+    context_end = min(text_len, end + 50)
 
     before = text[context_start:start]
-    entity_text = text[start:end]
-    after = text[context_end:end]
-
-    print(f"\n{'='*80}")
-    print(f"Snippet {snippet_num} | Entity {entity_num}/{total_entities}")
-    print(f"{'='*80}")
-    print(f"\nContext: ...{before}[[[{entity_text}]]]{after}...")
-    print(f"\nEntity: \"{entity_text}\"")
-    print(f"Type: {entity['type']} ({ENTITY_TYPES.get(entity['type'], 'Unknown')})")
-    print(f"Source: {entity.get('source', 'unknown')} (confidence: {entity.get('confidence', 0):.2f})")
+    entity_text = entity.get('text') or text[start:end]
+    after = text[end:context_end]
+
+    # Build the whole panel and print it in one call
+    lines = [
+        f"\n{_EQ80}",
+        f"Snippet {snippet_num} | Entity {entity_num}/{total_entities}",
+        _EQ80,
+        f"\nContext: ...{before}[[[{entity_text}]]]{after}...",
+        f"\nEntity: \"{entity_text}\"",
+        f"Type: {entity['type']} ({ENTITY_TYPES.get(entity['type'], 'Unknown')})",
+        f"Source: {entity.get('source', 'unknown')} (confidence: {entity.get('confidence', 0):.2f})",
+    ]
     if entity.get('notes'):
-        print(f"Notes: {entity['notes']}")
-
-
-def review_entity(text: str, entity: Dict, snippet_num: int, entity_num: int, total_entities: int) -> Dict:
-    """Review a single entity with human in the loop."""
-    display_entity_in_context(text, entity, snippet_num, entity_num, total_entities)
+        lines.append(f"Notes: {entity['notes']}")
+    print('\n'.join(lines))
+
+
+def find_overlaps(entities: List[Dict], start: int, end: int) -> List[int]:
+    """Indices of entities whose span overlaps [start, end)."""
+    return [i for i, ent in enumerate(entities) if ent['start'] < end and start < ent['end']]
+
+
+def _overlap_warning(accepted: List[Dict], overlaps: List[int]) -> str:
+    """Describe the accepted entities a new span overlaps."""
+    return "  WARNING: overlaps accepted " + ", ".join(
+        f"\"{accepted[i]['text']}\" ({accepted[i]['type']})" for i in overlaps)
+
+
+MODIFY_FIELDS = ('type', 'start', 'end', 'notes')
+
+
+def parse_cmd(command: str):
+    """
+    Split a review command into (action, fields).
+
+    e.g. 'm type=PER start=12 end=18 notes="Chief, not place"' gives
+    ('m', {'type': 'PER', 'start': '12', 'end': '18', 'notes': 'Chief, not place'}).
+    Raises ValueError on unbalanced quotes.
+    """
+    parts = shlex.split(command)
+    if not parts:
+        return '', {}
+    fields = dict(part.split('=', 1) for part in parts[1:] if '=' in part)
+    return parts[0].lower(), {key.lower(): value for key, value in fields.items()}
+
+
+def modify_from_fields(text: str, entity: Dict, fields: Dict, text_len: int, accepted: List[Dict]) -> bool:
+    """
+    Apply a one-line modify command's fields to entity.
+
+    Everything is validated before anything is changed; returns False (entity
+    untouched) if any field is invalid.
+    """
+    unknown = set(fields) - set(MODIFY_FIELDS)
+    if unknown:
+        print(f"  Unknown field(s): {', '.join(sorted(unknown))} (use {', '.join(MODIFY_FIELDS)})")
+        return False
+
+    new_type = fields.get('type', entity['type']).upper()
+    if new_type not in ENTITY_TYPES:
+        print(f"  Invalid type: {new_type}")
+        return False
+
+    try:
+        new_start = int(fields.get('start', entity['start']))
+        new_end = int(fields.get('end', entity['end']))
+    except ValueError:
+        print("  Invalid start/end")
+        return False
+    if not 0 <= new_start < new_end <= text_len:
+        print("  Boundaries outside snippet or empty")
+        return False
+
+    if new_type != entity['type']:
+        entity['type'] = new_type
+        print(f"  Updated type to: {new_type}")
+
+    if (new_start, new_end) != (entity['start'], entity['end']):
+        # The boundaries were typed explicitly, so overlaps only warn here
+        overlaps = find_overlaps(accepted, new_start, new_end)
+        if overlaps:
+            print(_overlap_warning(accepted, overlaps))
+        entity['start'] = new_start
+        entity['end'] = new_end
+        entity['text'] = text[new_start:new_end]
+        print(f"  Updated boundaries: {entity['text']}")
+
+    if fields.get('notes'):
+        entity['notes'] = fields['notes']
+    return True
+
+
+def review_entity(text: str, entity: Dict, snippet_num: int, entity_num: int, total_entities: int,
+                  text_len: int = None, accepted: List[Dict] = ()) -> Dict:
+    """
+    Review a single entity with human in the loop.
+
+    Modified boundaries are checked against the snippet and against the
+    entities already accepted in it (accepted). A modify can be given on one
+    line (see parse_cmd); a bare 'm' prompts for each change.
+    """
+    if text_len is None:
+        text_len = len(text)
+    display_entity_in_context(text, entity, snippet_num, entity_num, total_entities, text_len)
 
     while True:
-        print(f"\n{'─'*80}")
-        choice = input("Action? [(y)es/(n)o/(m)odify/(s)kip snippet]: ").strip().lower()
+        print(f"\n{_DASH80}")
+        try:
+            choice, fields = parse_cmd(input("Action? [(y)es/(n)o/(m)odify/(s)kip snippet]: "))
+        except ValueError:
+            print("Invalid command (unbalanced quotes)")
+            continue
 
         if choice == 'y' or choice == '':
             # Accept entity
@@ -82,6 +237,16 @@ def review_entity(text: str, entity: Dict, snippet_num: int, entity_num: int, to
             print("  ✗ Rejected")
             return None
 
+        elif choice == 'm' and fields:
+            # Modify entity from a one-line command
+            if not modify_from_fields(text, entity, fields, text_len, accepted):
+                continue
+
+            entity['confidence'] = 1.0
+            entity['reviewed'] = True
+            print("  ✓ Modified and accepted")
+            return entity
+
         elif choice == 'm':
             # Modify entity
             print("\nModify entity:")
@@ -102,12 +267,24 @@ def review_entity(text: str, entity: Dict, snippet_num: int, entity_num: int, to
                 try:
                     new_start = int(input(f"  Start position (current {entity['start']}): ").strip())
                     new_end = int(input(f"  End position (current {entity['end']}): ").strip())
-                    entity['start'] = new_start
-                    entity['end'] = new_end
-                    entity['text'] = text[new_start:new_end]
-                    print(f"  Updated boundaries: {entity['text']}")
                 except ValueError:
                     print("  Invalid input, keeping original boundaries")
+                else:
+                    if not 0 <= new_start < new_end <= text_len:
+                        print("  Boundaries outside snippet or empty, keeping original boundaries")
+                    else:
+                        overlaps = find_overlaps(accepted, new_start, new_end)
+                        keep = 'y'
+                        if overlaps:
+                            print(_overlap_warning(accepted, overlaps))
+                            keep = input("  Use these boundaries anyway? (y/n): ").strip().lower()
+                        if keep == 'y':
+                            entity['start'] = new_start
+                            entity['end'] = new_end
+                            entity['text'] = text[new_start:new_end]
+                            print(f"  Updated boundaries: {entity['text']}")
+                        else:
+                            print("  Keeping original boundaries")
 
             # Add notes
             notes = input("Notes (optional): ").strip()
@@ -125,39 +302,44 @@ def review_entity(text: str, entity: Dict, snippet_num: int, entity_num: int, to
 
         else:
             print("Invalid choice. Use: y (yes), n (no), m (modify), s (skip snippet)")
+            print("  One-line modify: m type=PER start=12 end=18 notes=\"...\"")
+
+
+@lru_cache(maxsize=1024)
+def _compiled(entity_text: str):
+    """Compile (once) a case-insensitive literal pattern for entity text."""
+    return re.compile(re.escape(entity_text), re.IGNORECASE)
 
 
 def add_additional_entities(text: str, existing_entities: List[Dict]) -> List[Dict]:
-    """Allow user to add entities that were missed by AI."""
-    print(f"\n{'='*80}")
-    print("Add additional entities that were missed?")
-    print(f"{'='*80}")
-    print(f"\nText:\n{text}\n")
+    """
+    Allow user to add entities that were missed by AI.
+
+    Entries are collected first and located at the end in a single
+    case-insensitive pass over the snippet, and every occurrence is added.
+    Matches do not overlap: the match starting earliest wins, and among
+    entries starting at the same position the longest wins, so a nested
+    mention (e.g. "Hudson Bay" inside "Hudson Bay Company") is not annotated
+    twice. Entries left with no occurrence of their own are reported.
+    """
+    print(f"\n{_EQ80}\nAdd additional entities that were missed?\n{_EQ80}\n\nText:\n{text}\n")
 
     print("Current entities:")
     for i, ent in enumerate(existing_entities, 1):
         print(f"  {i}. \"{ent['text']}\" ({ent['type']})")
 
-    new_entities = []
+    additions = []
 
     while True:
         entity_text = input("\nEntity text (or Enter to finish): ").strip()
         if not entity_text:
             break
 
-        # Find entity in text
-        matches = []
-        pattern = re.escape(entity_text)
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            matches.append((match.start(), match.end()))
-
-        if not matches:
+        # Check the entity occurs; occurrences are collected after the loop
+        if _compiled(entity_text).search(text) is None:
             print(f"  WARNING: '{entity_text}' not found in snippet.")
             continue
 
-        if len(matches) > 1:
-            print(f"  Found {len(matches)} matches. Using all occurrences.")
-
         # Get entity type
         print("  Entity types:")
         for code, desc in ENTITY_TYPES.items():
@@ -169,30 +351,48 @@ def add_additional_entities(text: str, existing_entities: List[Dict]) -> List[Di
             continue
 
         notes = input("  Notes (optional): ").strip()
+        additions.append((entity_text, entity_type, notes))
+
+    if not additions:
+        return []
 
-        # Add all matches
-        for start, end in matches:
-            entity = {
-                'text': text[start:end],
-                'start': start,
-                'end': end,
-                'type': entity_type,
-                'confidence': 1.0,
-                'source': 'human_added',
-                'reviewed': True,
-                'notes': notes if notes else 'Added during review'
-            }
-            new_entities.append(entity)
-            print(f"  ✓ Added: {entity['text']} ({entity_type})")
+    # Find all occurrences of every entry in one pass, longest entries first
+    additions.sort(key=lambda addition: len(addition[0]), reverse=True)
+    pattern = re.compile(
+        '|'.join(f'(?P<e{i}>{re.escape(entity_text)})'
+                 for i, (entity_text, _, _) in enumerate(additions)),
+        re.IGNORECASE)
+
+    new_entities = []
+    matched = set()
+    for match in pattern.finditer(text):
+        addition_index = int(match.lastgroup[1:])
+        matched.add(addition_index)
+        _, entity_type, notes = additions[addition_index]
+        entity = {
+            'text': match.group(),
+            'start': match.start(),
+            'end': match.end(),
+            'type': entity_type,
+            'confidence': 1.0,
+            'source': 'human_added',
+            'reviewed': True,
+            'notes': notes if notes else 'Added during review'
+        }
+        new_entities.append(entity)
+        print(f"  ✓ Added: {entity['text']} ({entity_type})")
+
+    for i, (entity_text, entity_type, _) in enumerate(additions):
+        if i not in matched:
+            print(f"  WARNING: '{entity_text}' ({entity_type}) not added: every occurrence "
+                  f"overlaps another entry.")
 
     return new_entities
 
 
 def review_snippet(snippet: Dict, snippet_num: int, total_snippets: int) -> Dict:
     """Review all entities in a snippet."""
-    print(f"\n\n{'#'*80}")
-    print(f"# SNIPPET {snippet_num}/{total_snippets}")
-    print(f"{'#'*80}")
+    print(f"\n\n{_HASH80}\n# SNIPPET {snippet_num}/{total_snippets}\n{_HASH80}")
 
     entities = snippet['entities']
     reviewed_entities = []
@@ -205,8 +405,10 @@ def review_snippet(snippet: Dict, snippet_num: int, total_snippets: int) -> Dict
             reviewed_entities.extend(new_entities)
     else:
         # Review each entity
+        text_len = len(snippet['text'])
         for i, entity in enumerate(entities, 1):
-            result = review_entity(snippet['text'], entity, snippet_num, i, len(entities))
+            result = review_entity(snippet['text'], entity, snippet_num, i, len(entities), text_len,
+                                   reviewed_entities)
 
             if result == 'SKIP_SNIPPET':
                 return None
@@ -225,12 +427,58 @@ def review_snippet(snippet: Dict, snippet_num: int, total_snippets: int) -> Dict
         'text': snippet['text'],
         'char_start': snippet['char_start'],
         'char_end': snippet['char_end'],
-        'entities': sorted(reviewed_entities, key=lambda e: e['start'])
+        'entities': sorted(reviewed_entities, key=itemgetter('start'))
     }
 
 
+def write_atomic(path: Path, data: bytes):
+    """Write data to path via a temporary file, so a crash never leaves it half-written."""
+    tmp_file = path.with_name(path.name + '.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+
+def review_log_path(doc_id: str) -> Path:
+    """Append-only log of snippets reviewed so far in an unfinished session."""
+    return Path('test_dataset/gold_standard') / f'{doc_id}_gold.jsonl'
+
+
+def load_review_log(log_file: Path) -> Tuple[Dict[int, Optional[Dict]], int]:
+    """
+    Read a review log into {snippet_id: reviewed snippet, or None if skipped}.
+
+    Also returns the byte length of the valid part of the log. A line cut
+    short by a crash mid-write (unterminated or unparseable) ends the log;
+    the caller truncates the file there before appending.
+    """
+    reviewed = {}
+    if not log_file.exists():
+        return reviewed, 0
+
+    data = log_file.read_bytes()
+    valid_end = 0
+    while True:
+        line_end = data.find(b'\n', valid_end)
+        if line_end == -1:
+            break
+        try:
+            record = _loads(data[valid_end:line_end])
+        except ValueError:
+            break
+        reviewed[record['snippet_id']] = record['reviewed']
+        valid_end = line_end + 1
+    return reviewed, valid_end
+
+
 def save_gold_standard(doc_id: str, doc_metadata: Dict, reviewed_snippets: List[Dict]):
     """Save reviewed annotations as gold standard."""
+    entity_counts = Counter(entity['type']
+                            for snippet in reviewed_snippets
+                            for entity in snippet['entities'])
+
     output = {
         'document_id': doc_id,
         'metadata': doc_metadata,
@@ -238,7 +486,7 @@ def save_gold_standard(doc_id: str, doc_metadata: Dict, reviewed_snippets: List[
         'annotator': 'human_reviewed',
         'annotation_method': 'ai_assisted',
         'total_snippets': len(reviewed_snippets),
-        'total_entities': sum(len(s['entities']) for s in reviewed_snippets),
+        'total_entities': sum(entity_counts.values()),
         'snippets': reviewed_snippets
     }
 
@@ -247,25 +495,47 @@ def save_gold_standard(doc_id: str, doc_metadata: Dict, reviewed_snippets: List[
     gold_dir.mkdir(exist_ok=True)
 
     output_file = gold_dir / f'{doc_id}_gold.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    write_atomic(output_file, _dumps(output))
 
-    print(f"\n{'='*80}")
+    print(f"\n{_EQ80}")
     print(f"✓ Gold standard saved to: {output_file}")
     print(f"  Total snippets: {len(reviewed_snippets)}")
     print(f"  Total entities: {output['total_entities']}")
 
     # Print entity type breakdown
-    entity_counts = {}
-    for snippet in reviewed_snippets:
-        for entity in snippet['entities']:
-            entity_type = entity['type']
-            entity_counts[entity_type] = entity_counts.get(entity_type, 0) + 1
-
     print(f"\n  Entity breakdown:")
     for etype, count in sorted(entity_counts.items()):
         print(f"    {etype}: {count}")
-    print(f"{'='*80}\n")
+    print(f"{_EQ80}\n")
+
+
+def read_draft_summary(draft_file: Path, index: Dict):
+    """
+    Return (document_id, total_entities) for a draft file.
+
+    Uses the draft index record when it is current (same mtime as the file).
+    Otherwise, with ijson installed the draft is streamed only until both
+    header fields are seen, so the snippets are never parsed.
+    """
+    record = index.get(draft_file.name[:-len('_draft.json')])
+    if record is not None and record['mtime_ns'] == draft_file.stat().st_mtime_ns:
+        return record['doc_id'], record['total_entities']
+
+    if ijson is None:
+        data = _loads(draft_file.read_bytes())
+        return data['document_id'], data.get('total_entities', 0)
+
+    doc_id = None
+    num_entities = None
+    with open(draft_file, 'rb') as f:
+        for prefix, _, value in ijson.parse(f):
+            if prefix == 'document_id':
+                doc_id = value
+            elif prefix == 'total_entities':
+                num_entities = value
+            if doc_id is not None and num_entities is not None:
+                break
+    return doc_id, num_entities or 0
 
 
 def list_available_drafts():
@@ -281,14 +551,12 @@ def list_available_drafts():
 
     print("Available drafts for review:\n")
     print(f"{'Document ID':<35} {'Entities':<10}")
-    print("-" * 50)
+    print(_BAR50)
 
+    index = load_draft_index(draft_dir)
     for draft_file in sorted(draft_files):
-        with open(draft_file, 'r') as f:
-            data = json.load(f)
-            doc_id = data['document_id']
-            num_entities = data.get('total_entities', 0)
-            print(f"{doc_id:<35} {num_entities:<10}")
+        doc_id, num_entities = read_draft_summary(draft_file, index)
+        print(f"{doc_id:<35} {num_entities:<10}")
 
     print(f"\nTotal: {len(draft_files)} drafts")
     return [f.stem.replace('_draft', '') for f in sorted(draft_files)]
@@ -296,6 +564,11 @@ def list_available_drafts():
 
 def main():
     """Main review workflow."""
+    # Interactive stdout is line-buffered, costing a write per printed line.
+    # input() flushes stdout before every prompt, so block buffering is safe.
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False)
+
     if len(sys.argv) < 2:
         list_available_drafts()
         print("\nUsage: python review_draft_annotations.py [document_id]")
@@ -303,10 +576,7 @@ def main():
 
     doc_id = sys.argv[1]
 
-    print(f"\n{'='*80}")
-    print(f"AI-ASSISTED ANNOTATION: Human Review")
-    print(f"Document: {doc_id}")
-    print(f"{'='*80}\n")
+    print(f"\n{_EQ80}\nAI-ASSISTED ANNOTATION: Human Review\nDocument: {doc_id}\n{_EQ80}\n")
 
     # Load draft
     draft = load_draft(doc_id)
@@ -319,19 +589,35 @@ def main():
 
     input("\nPress Enter to begin review...")
 
-    # Review each snippet
-    reviewed_snippets = []
-    for i, snippet in enumerate(draft['snippets'], 1):
-        result = review_snippet(snippet, i, len(draft['snippets']))
-        if result is not None:
-            reviewed_snippets.append(result)
+    # Resume an interrupted session from its review log
+    log_file = review_log_path(doc_id)
+    logged, log_valid_end = load_review_log(log_file)
+    if logged:
+        print(f"Resuming review: {len(logged)} snippet(s) already reviewed")
+
+    # Review each snippet, logging each result as soon as it is done
+    log_file.parent.mkdir(exist_ok=True)
+    reviewed_snippets = [result for result in logged.values() if result is not None]
+    with open(log_file, 'ab') as log:
+        # Drop any partial line left by a crash so new records start cleanly
+        log.truncate(log_valid_end)
+        for i, snippet in enumerate(draft['snippets'], 1):
+            if snippet['snippet_id'] in logged:
+                continue
+            result = review_snippet(snippet, i, len(draft['snippets']))
+            log.write(_dumps_line({'snippet_id': snippet['snippet_id'], 'reviewed': result}))
+            log.flush()
+            if result is not None:
+                reviewed_snippets.append(result)
 
     if not reviewed_snippets:
+        log_file.unlink()
         print("\nNo snippets were reviewed. Exiting.")
         return 0
 
-    # Save gold standard
+    # Save gold standard; the session is complete, so its log is dropped
     save_gold_standard(doc_id, draft['metadata'], reviewed_snippets)
+    log_file.unlink()
 
     print("✓ Review complete!")
     return 0